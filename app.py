@@ -2,13 +2,11 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, timedelta
-from textblob import TextBlob
+import numpy as np
+from datetime import datetime
+from textblob.en.sentiments import PatternAnalyzer
 import re
-from collections import Counter
-import time
+from collections import deque
 
 # Set page configuration
 st.set_page_config(page_title="Live Sentiment Dashboard", layout="wide")
@@ -18,34 +16,42 @@ st.write("Monitor live sentiment trends for a keyword or brand.")
 # -------------------------------
 # Text preprocessing function
 # -------------------------------
+# Compiled once at import; mentions, hashtags and URLs share a single pass
+_CLEAN_RE = re.compile(r'(@[A-Za-z0-9_]+|#[A-Za-z0-9_]+|https?://[A-Za-z0-9./]+)')
+_NON_ALPHA_RE = re.compile(r'[^A-Za-z\s]')
+
 def preprocess_text(text):
-    # Remove mentions, hashtags, URLs, and special characters
-    text = re.sub(r'@[A-Za-z0-9_]+', '', text)  # Remove mentions
-    text = re.sub(r'#[A-Za-z0-9_]+', '', text)  # Remove hashtags
-    text = re.sub(r'https?://[A-Za-z0-9./]+', '', text)  # Remove URLs
-    text = re.sub(r'[^A-Za-z\s]', '', text)  # Remove special characters
-    text = text.lower().strip()  # Convert to lowercase and remove extra spaces
-    return text
+    # Remove mentions, hashtags, URLs, and special characters,
+    # then convert to lowercase and remove extra spaces
+    return _NON_ALPHA_RE.sub('', _CLEAN_RE.sub('', text)).lower().strip()
 
 # -------------------------------
 # Sentiment analyzer and classifier (Positive/Negative only)
 # -------------------------------
+# Load the TextBlob lexicon once per server process rather than lazily on
+# the first refresh of each session
+@st.cache_resource(show_spinner=False)
+def load_analyzer():
+    analyzer = PatternAnalyzer()
+    analyzer.analyze("warmup")
+    return analyzer
+
+_ANALYZER = load_analyzer()
+
 def analyze_sentiment(text):
-    # Preprocess the text
-    cleaned_text = preprocess_text(text)
-    
-    # Analyze sentiment
-    polarity = TextBlob(cleaned_text).sentiment.polarity
+    # Preprocess the text and analyze sentiment
+    polarity = _ANALYZER.analyze(preprocess_text(text)).polarity
     
     # Classify sentiment (Positive/Negative only)
     if polarity > 0:
         sentiment = "Positive"
-        sentiment_emoji = "😊"
     else:
         sentiment = "Negative"
-        sentiment_emoji = "😠"
         
-    return polarity, sentiment, sentiment_emoji
+    return polarity, sentiment
+
+# Emoji is derived from the label at render time rather than stored per row
+SENTIMENT_EMOJI = {"Positive": "😊", "Negative": "😠"}
 
 # -------------------------------
 # Simulated live tweet fetcher
@@ -69,13 +75,142 @@ def get_fake_tweets(keyword, n=5):
         f"{keyword} is a scam. Don't fall for their marketing.",
         f"Best decision I ever made was purchasing {keyword}!"
     ]
-    return sample_texts[:n]
+    return tuple(sample_texts[:n])
+
+# -------------------------------
+# Dashboard tabs
+# -------------------------------
+def render_trend(df, rolling_avg, keyword):
+    # Time series chart, rendered client-side
+    st.subheader(f"Sentiment Trend for '{keyword}'")
+    chart_data = df.set_index("time")[["sentiment_score"]]
+    
+    # Rolling average for smoother trend line, maintained as batches arrive
+    chart_data = chart_data.assign(rolling_avg=rolling_avg)
+    
+    st.line_chart(chart_data[["sentiment_score", "rolling_avg"]])
+
+def render_distribution(sentiment_counts):
+    # Sentiment distribution chart
+    st.subheader("Sentiment Distribution")
+    st.bar_chart(sentiment_counts)
+
+# Border and background (light green / light red) per sentiment
+FEED_COLORS = {"Positive": ("green", "#e8f5e9"), "Negative": ("red", "#ffebee")}
+
+def render_feed(df):
+    # Live feed of tweets with sentiment
+    st.subheader("Live Feed")
+    
+    # Build the latest tweets as one HTML block, each in a container with a
+    # colored border based on sentiment. Rows are appended in time order and
+    # share a timestamp within a batch, so reverse rather than sort to keep
+    # the feed newest-first
+    html_parts = []
+    for row in df.tail(10).iloc[::-1].itertuples(index=False):
+        color, bg_color = FEED_COLORS[row.sentiment]
+        html_parts.append(f"""
+        <div style="border-left: 5px solid {color}; padding: 10px; margin: 10px 0; background-color: {bg_color};">
+            <div style="display: flex; justify-content: space-between;">
+                <span><b>{SENTIMENT_EMOJI[row.sentiment]} {row.sentiment}</b></span>
+                <span style="color: gray; font-size: 0.8em;">{row.time.strftime('%H:%M:%S')}</span>
+            </div>
+            <p>{row.text}</p>
+            <div style="color: gray; font-size: 0.8em;">Score: {row.sentiment_score:.3f}</div>
+        </div>
+        """)
+    st.markdown("".join(html_parts), unsafe_allow_html=True)
+
+# Cached per session; the row count and last update time identify the
+# history, so the CSV is only re-encoded after new data arrives
+def to_csv_bytes(df):
+    key = (len(df), st.session_state.last_update)
+    if st.session_state.csv_cache[0] != key:
+        st.session_state.csv_cache = (key, df.to_csv(index=False).encode())
+    return st.session_state.csv_cache[1]
+
+SENTIMENT_MARKERS = {"Positive": "🟢 Positive", "Negative": "🔴 Negative"}
+
+@st.fragment
+def render_raw(df, keyword):
+    # Raw data table
+    st.subheader("Raw Data")
+    display_df = df[["time", "text", "sentiment", "sentiment_score"]].copy()
+    display_df["time"] = display_df["time"].dt.strftime("%H:%M:%S")
+    
+    # Color-code the sentiment column with a marker instead of a per-cell Styler
+    display_df["sentiment"] = display_df["sentiment"].map(SENTIMENT_MARKERS)
+    
+    st.dataframe(display_df.iloc[::-1])
+    
+    # Add download button
+    csv = to_csv_bytes(df)
+    st.download_button(
+        label="Download data as CSV",
+        data=csv,
+        file_name=f"sentiment_data_{keyword}.csv",
+        mime="text/csv",
+    )
+
+# -------------------------------
+# History buffers
+# -------------------------------
+# History is stored column-wise in typed arrays that double in capacity when
+# full, so appends are amortized O(1); a DataFrame is built only for display
+DATA_DTYPES = {
+    "sentiment_score": "float32",
+    "sentiment": pd.CategoricalDtype(categories=["Positive", "Negative"]),
+}
+
+def new_history(capacity=64):
+    return {
+        "size": 0,
+        "time": np.empty(capacity, dtype="datetime64[ns]"),
+        "text": [],
+        "sentiment_score": np.empty(capacity, dtype=np.float32),
+        "sentiment": np.empty(capacity, dtype=np.int8),  # category codes
+    }
+
+def append_history(history, batch):
+    size = history["size"]
+    end = size + len(batch)
+    capacity = len(history["sentiment_score"])
+    if end > capacity:
+        capacity = max(2 * capacity, end)
+        for col in ("time", "sentiment_score", "sentiment"):
+            grown = np.empty(capacity, dtype=history[col].dtype)
+            grown[:size] = history[col][:size]
+            history[col] = grown
+    history["time"][size:end] = batch["time"].to_numpy(dtype="datetime64[ns]")
+    history["sentiment_score"][size:end] = batch["sentiment_score"].to_numpy()
+    history["sentiment"][size:end] = batch["sentiment"].cat.codes.to_numpy()
+    history["text"].extend(batch["text"])
+    history["size"] = end
+
+def history_frame(history):
+    size = history["size"]
+    return pd.DataFrame({
+        "time": history["time"][:size],
+        "text": history["text"],
+        "sentiment_score": history["sentiment_score"][:size],
+        "sentiment": pd.Categorical.from_codes(
+            history["sentiment"][:size], dtype=DATA_DTYPES["sentiment"]
+        ),
+    })
 
 # -------------------------------
 # Initialize session state
 # -------------------------------
-if "data" not in st.session_state:
-    st.session_state.data = pd.DataFrame(columns=["time", "text", "sentiment_score", "sentiment", "sentiment_emoji"])
+if "history" not in st.session_state:
+    st.session_state.history = new_history()
+# 3-point rolling average of sentiment_score, kept parallel to history
+if "rolling" not in st.session_state:
+    st.session_state.rolling = []
+    st.session_state.rolling_window = deque(maxlen=3)
+if "last_batch" not in st.session_state:
+    st.session_state.last_batch = ((), None)
+if "csv_cache" not in st.session_state:
+    st.session_state.csv_cache = (None, b"")
 if "last_update" not in st.session_state:
     st.session_state.last_update = datetime.now()
 if "running" not in st.session_state:
@@ -100,173 +235,96 @@ with st.sidebar:
             st.rerun()
     with col2:
         if st.button("Clear Data"):
-            st.session_state.data = pd.DataFrame(columns=["time", "text", "sentiment_score", "sentiment", "sentiment_emoji"])
+            st.session_state.history = new_history()
+            st.session_state.rolling = []
+            st.session_state.rolling_window = deque(maxlen=3)
+            st.session_state.last_update = datetime.now()
             st.rerun()
     
     # Display current status
     if st.session_state.running:
         st.success("Monitoring is ACTIVE")
-        next_update = st.session_state.last_update + timedelta(seconds=refresh_rate)
-        st.write(f"Next update: {next_update.strftime('%H:%M:%S')}")
+        st.write(f"Refreshing every {refresh_rate} seconds")
     else:
         st.info("Monitoring is PAUSED")
 
 # -------------------------------
 # Main dashboard
 # -------------------------------
-# Update data if monitoring is running
-if st.session_state.running:
+REFRESH_TOLERANCE = 0.5  # seconds
+
+# Only this fragment re-executes on each refresh tick; the sidebar and the
+# rest of the page are left alone until the user interacts with them
+@st.fragment(run_every=refresh_rate if st.session_state.running else None)
+def live_dashboard(keyword, refresh_rate, tweets_per_refresh):
+    # Update data if monitoring is running. Full-script reruns (widget changes,
+    # Clear Data) also run this fragment, so only fetch once a refresh interval
+    # has elapsed; the tolerance absorbs run_every timer jitter
     time_since_update = (datetime.now() - st.session_state.last_update).total_seconds()
-    
-    if time_since_update >= refresh_rate:
-        # Fetch "live" tweets
+    if st.session_state.running and time_since_update >= refresh_rate - REFRESH_TOLERANCE:
+        # Fetch "live" tweets; the whole batch shares one fetch time
         tweets = get_fake_tweets(keyword, n=tweets_per_refresh)
+        now = datetime.now()
 
-        # Analyze and append results
-        new_data = []
-        for t in tweets:
-            score, sentiment, emoji = analyze_sentiment(t)
-            new_data.append({
-                "time": datetime.now(), 
-                "text": t, 
-                "sentiment_score": score,
-                "sentiment": sentiment,
-                "sentiment_emoji": emoji
-            })
-
-        df_new = pd.DataFrame(new_data)
-        st.session_state.data = pd.concat([st.session_state.data, df_new], ignore_index=True)
-        st.session_state.last_update = datetime.now()
-        
-        # Force update of the display
-        st.rerun()
-
-# Display metrics if we have data
-if not st.session_state.data.empty:
-    positive = len(st.session_state.data[st.session_state.data["sentiment"] == "Positive"])
-    negative = len(st.session_state.data[st.session_state.data["sentiment"] == "Negative"])
-    total = len(st.session_state.data)
-    
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Total Posts", total)
-    col2.metric("Positive", f"{positive} 😊", f"{positive/total*100:.1f}%")
-    col3.metric("Negative", f"{negative} 😠", f"{negative/total*100:.1f}%")
-    
-    # Create tabs for different visualizations
-    tab1, tab2, tab3, tab4 = st.tabs(["Sentiment Trend", "Distribution", "Live Feed", "Raw Data"])
-    
-    with tab1:
-        # Time series chart with better formatting
-        st.subheader("Sentiment Trend Over Time")
-        chart_data = st.session_state.data[["time", "sentiment_score"]].copy()
-        chart_data["time"] = pd.to_datetime(chart_data["time"])
-        chart_data = chart_data.set_index("time")
-        
-        # Calculate rolling average for smoother trend line
-        chart_data["rolling_avg"] = chart_data["sentiment_score"].rolling(window=3, min_periods=1).mean()
-        
-        # Create a more visually appealing chart
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.plot(chart_data.index, chart_data["sentiment_score"], 'o-', alpha=0.5, label='Individual Scores')
-        ax.plot(chart_data.index, chart_data["rolling_avg"], 'r-', linewidth=2, label='Trend (3-point avg)')
-        
-        # Add horizontal line at zero to separate positive and negative
-        ax.axhline(y=0, color='black', linestyle='-', alpha=0.7, label='Neutral Line')
-        
-        # Fill area above zero (positive) and below zero (negative)
-        ax.fill_between(chart_data.index, chart_data["rolling_avg"], 0, 
-                        where=chart_data["rolling_avg"] >= 0, color='green', alpha=0.2, label='Positive Area')
-        ax.fill_between(chart_data.index, chart_data["rolling_avg"], 0, 
-                        where=chart_data["rolling_avg"] < 0, color='red', alpha=0.2, label='Negative Area')
-        
-        ax.set_ylabel("Sentiment Score")
-        ax.set_xlabel("Time")
-        ax.set_title(f"Sentiment Trend for '{keyword}'")
-        ax.legend(loc='upper left')
-        ax.grid(True, alpha=0.3)
-        
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        st.pyplot(fig)
-    
-    with tab2:
-        # Sentiment distribution chart
-        st.subheader("Sentiment Distribution")
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
-        
-        # Pie chart
-        sentiment_counts = st.session_state.data["sentiment"].value_counts()
-        colors = ['#4CAF50', '#FF5252']  # Green, Red
-        ax1.pie(sentiment_counts.values, labels=sentiment_counts.index, autopct='%1.1f%%', 
-                colors=colors, startangle=90)
-        ax1.set_title("Sentiment Distribution")
-        
-        # Bar chart
-        ax2.bar(sentiment_counts.index, sentiment_counts.values, color=colors)
-        ax2.set_title("Sentiment Count")
-        ax2.set_ylabel("Number of Posts")
-        
-        # Add value labels on bars
-        for i, v in enumerate(sentiment_counts.values):
-            ax2.text(i, v + 0.1, str(v), ha='center', va='bottom')
+        # Analyze the whole batch column-wise, reusing the previous results
+        # when the feed returned the same tweets as the last refresh
+        if st.session_state.last_batch[0] != tweets:
+            scores = pd.Series(tweets).map(analyze_sentiment)
+            st.session_state.last_batch = (
+                tweets,
+                pd.DataFrame(scores.tolist(), columns=["sentiment_score", "sentiment"]).astype(DATA_DTYPES),
+            )
+
+        # Append results
+        df_new = pd.DataFrame({"time": [now] * len(tweets), "text": tweets}).join(
+            st.session_state.last_batch[1]
+        )
+
+        append_history(st.session_state.history, df_new)
+
+        # Extend the rolling average with only the new scores
+        window = st.session_state.rolling_window
+        for score in df_new["sentiment_score"]:
+            window.append(score)
+            st.session_state.rolling.append(sum(window) / len(window))
+        st.session_state.last_update = now
+
+    # Display metrics if we have data
+    if st.session_state.history["size"]:
+        # Materialize the history once per render
+        df = history_frame(st.session_state.history)
+
+        # Count both classes in a single pass
+        sentiment_counts = df["sentiment"].value_counts()
+        positive = int(sentiment_counts.get("Positive", 0))
+        negative = int(sentiment_counts.get("Negative", 0))
+        total = len(df)
         
-        plt.tight_layout()
-        st.pyplot(fig)
-    
-    with tab3:
-        # Live feed of tweets with sentiment
-        st.subheader("Live Feed")
+        st.caption(f"Last update: {st.session_state.last_update.strftime('%H:%M:%S')}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Posts", total)
+        col2.metric("Positive", f"{positive} 😊", f"{positive/total*100:.1f}%")
+        col3.metric("Negative", f"{negative} 😠", f"{negative/total*100:.1f}%")
         
-        # Display latest tweets with sentiment
-        for _, row in st.session_state.data.tail(10).sort_values("time", ascending=False).iterrows():
-            # Create a colored box based on sentiment
-            if row["sentiment"] == "Positive":
-                color = "green"
-                bg_color = "#e8f5e9"  # Light green
-            else:
-                color = "red"
-                bg_color = "#ffebee"  # Light red
-            
-            # Display tweet in a container with colored border
-            st.markdown(f"""
-            <div style="border-left: 5px solid {color}; padding: 10px; margin: 10px 0; background-color: {bg_color};">
-                <div style="display: flex; justify-content: space-between;">
-                    <span><b>{row['sentiment_emoji']} {row['sentiment']}</b></span>
-                    <span style="color: gray; font-size: 0.8em;">{row['time'].strftime('%H:%M:%S')}</span>
-                </div>
-                <p>{row['text']}</p>
-                <div style="color: gray; font-size: 0.8em;">Score: {row['sentiment_score']:.3f}</div>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    with tab4:
-        # Raw data table
-        st.subheader("Raw Data")
-        display_df = st.session_state.data[["time", "text", "sentiment", "sentiment_score"]].copy()
-        display_df["time"] = display_df["time"].dt.strftime("%H:%M:%S")
+        # Create tabs for different visualizations
+        tab1, tab2, tab3, tab4 = st.tabs(["Sentiment Trend", "Distribution", "Live Feed", "Raw Data"])
         
-        # Apply color coding to the sentiment column
-        def color_sentiment(val):
-            color = 'green' if val == 'Positive' else 'red'
-            return f'color: {color}; font-weight: bold'
+        with tab1:
+            render_trend(df, st.session_state.rolling, keyword)
         
-        styled_df = display_df.sort_values("time", ascending=False).style.applymap(
-            color_sentiment, subset=['sentiment']
-        )
+        with tab2:
+            render_distribution(sentiment_counts)
         
-        st.dataframe(styled_df)
+        with tab3:
+            render_feed(df)
         
-        # Add download button
-        csv = st.session_state.data.to_csv(index=False)
-        st.download_button(
-            label="Download data as CSV",
-            data=csv,
-            file_name=f"sentiment_data_{keyword}.csv",
-            mime="text/csv",
-        )
+        with tab4:
+            render_raw(df, keyword)
+
+    else:
+        st.info("Click 'Start Monitoring' to begin collecting data.")
 
-else:
-    st.info("Click 'Start Monitoring' to begin collecting data.")
+live_dashboard(keyword, refresh_rate, tweets_per_refresh)
 
 # -------------------------------
 # Footer